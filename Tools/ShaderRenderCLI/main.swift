@@ -6,6 +6,12 @@ import AppKit
 // Simple headless renderer CLI
 // Usage:
 // swift run ShaderRenderCLI --shader-file path/to/shader.metal --out out.png [--width 256 --height 256 --time 0.0]
+//
+// Batch mode keeps the device, pipeline and output texture alive across frames:
+// swift run ShaderRenderCLI --shader-file path/to/shader.metal --batch - [--width 256 --height 256]
+// reads one JSON object per line from stdin (or from a manifest file instead of "-"),
+// e.g. {"out": "render_0.png", "time": 0.0}, and writes one JSON ack line per frame
+// to stdout: {"out": "render_0.png", "ok": true} or {"out": ..., "ok": false, "error": ...}.
 
 @main
 struct ShaderRenderCLI {
@@ -16,6 +22,7 @@ struct ShaderRenderCLI {
         var width = 256
         var height = 256
         var time: Float = 0.0
+        var batchSource: String? = nil
 
         var i = 1
         while i < args.count {
@@ -26,6 +33,7 @@ struct ShaderRenderCLI {
             case "--width": if i+1 < args.count, let v = Int(args[i+1]) { width = v; i+=1 }
             case "--height": if i+1 < args.count, let v = Int(args[i+1]) { height = v; i+=1 }
             case "--time": if i+1 < args.count, let v = Float(args[i+1]) { time = v; i+=1 }
+            case "--batch": if i+1 < args.count { batchSource = args[i+1]; i+=1 }
             default: break
             }
             i += 1
@@ -44,48 +52,26 @@ struct ShaderRenderCLI {
         }
 
         // Compile fragment function
+        let renderer: Renderer
         do {
             let library = try device.makeLibrary(source: shaderSource, options: nil)
             guard let fragment = library.makeFunction(name: "fragmentShader") else {
                 fputs("[ShaderRenderCLI] fragmentShader not found\n", stderr)
                 exit(2)
             }
-            let vertex = try makeVertexFunction(device: device)
-            let pdesc = MTLRenderPipelineDescriptor()
-            pdesc.vertexFunction = vertex
-            pdesc.fragmentFunction = fragment
-            pdesc.colorAttachments[0].pixelFormat = .bgra8Unorm
-            let pipeline = try device.makeRenderPipelineState(descriptor: pdesc)
-
-            // Output texture
-            let tdesc = MTLTextureDescriptor.texture2DDescriptor(pixelFormat: .bgra8Unorm, width: width, height: height, mipmapped: false)
-            tdesc.usage = [.renderTarget, .shaderRead]
-            guard let tex = device.makeTexture(descriptor: tdesc) else { fatalError("texture") }
-
-            let rpd = MTLRenderPassDescriptor()
-            rpd.colorAttachments[0].texture = tex
-            rpd.colorAttachments[0].loadAction = .clear
-            rpd.colorAttachments[0].storeAction = .store
-            rpd.colorAttachments[0].clearColor = MTLClearColorMake(0, 0, 0, 1)
-
-            guard let cb = commandQueue.makeCommandBuffer(),
-                  let enc = cb.makeRenderCommandEncoder(descriptor: rpd) else { fatalError("enc") }
-            enc.setRenderPipelineState(pipeline)
-
-            // Uniforms
-            var t = time
-            var res = SIMD2<Float>(Float(width), Float(height))
-            var mouse = SIMD2<Float>(0.0, 0.0)
-            enc.setFragmentBytes(&t, length: MemoryLayout<Float>.size, index: 0)
-            enc.setFragmentBytes(&res, length: MemoryLayout<SIMD2<Float>>.size, index: 1)
-            enc.setFragmentBytes(&mouse, length: MemoryLayout<SIMD2<Float>>.size, index: 2)
-
-            enc.drawPrimitives(type: .triangleStrip, vertexStart: 0, vertexCount: 4)
-            enc.endEncoding()
-            cb.commit()
-            cb.waitUntilCompleted()
-
-            try saveTexture(tex, to: outPath)
+            renderer = try Renderer(device: device, commandQueue: commandQueue, fragment: fragment, width: width, height: height)
+        } catch {
+            fputs("[ShaderRenderCLI] Error: \(error)\n", stderr)
+            exit(3)
+        }
+
+        if let source = batchSource {
+            runBatch(renderer: renderer, source: source)
+            return
+        }
+
+        do {
+            try renderer.render(time: time, to: outPath)
             print("[ShaderRenderCLI] Saved \(outPath) (\(width)x\(height))")
         } catch {
             fputs("[ShaderRenderCLI] Error: \(error)\n", stderr)
@@ -94,6 +80,99 @@ struct ShaderRenderCLI {
     }
 }
 
+private struct BatchJob: Decodable {
+    let out: String
+    let time: Float?
+    let complexity: Float?
+    let colorShift: Float?
+}
+
+private func runBatch(renderer: Renderer, source: String) {
+    var readLineFn: () -> String? = { readLine() }
+    if source != "-" {
+        guard let text = try? String(contentsOfFile: source) else {
+            fputs("[ShaderRenderCLI] Cannot read batch manifest \(source)\n", stderr)
+            exit(4)
+        }
+        var lines = text.split(separator: "\n").map(String.init).makeIterator()
+        readLineFn = { lines.next() }
+    }
+
+    let decoder = JSONDecoder()
+    while let line = readLineFn() {
+        if line.trimmingCharacters(in: .whitespaces).isEmpty { continue }
+        var ack: [String: Any]
+        do {
+            let job = try decoder.decode(BatchJob.self, from: Data(line.utf8))
+            ack = ["out": job.out]
+            do {
+                try renderer.render(time: job.time ?? 0.0, to: job.out)
+                ack["ok"] = true
+            } catch {
+                ack["ok"] = false
+                ack["error"] = "\(error)"
+            }
+        } catch {
+            ack = ["ok": false, "error": "Invalid batch line: \(error)"]
+        }
+        if let data = try? JSONSerialization.data(withJSONObject: ack), let json = String(data: data, encoding: .utf8) {
+            print(json)
+        }
+        fflush(stdout)
+    }
+}
+
+private final class Renderer {
+    let commandQueue: MTLCommandQueue
+    let pipeline: MTLRenderPipelineState
+    let texture: MTLTexture
+    let passDescriptor: MTLRenderPassDescriptor
+
+    init(device: MTLDevice, commandQueue: MTLCommandQueue, fragment: MTLFunction, width: Int, height: Int) throws {
+        self.commandQueue = commandQueue
+        let vertex = try makeVertexFunction(device: device)
+        let pdesc = MTLRenderPipelineDescriptor()
+        pdesc.vertexFunction = vertex
+        pdesc.fragmentFunction = fragment
+        pdesc.colorAttachments[0].pixelFormat = .bgra8Unorm
+        pipeline = try device.makeRenderPipelineState(descriptor: pdesc)
+
+        // Output texture
+        let tdesc = MTLTextureDescriptor.texture2DDescriptor(pixelFormat: .bgra8Unorm, width: width, height: height, mipmapped: false)
+        tdesc.usage = [.renderTarget, .shaderRead]
+        guard let tex = device.makeTexture(descriptor: tdesc) else { fatalError("texture") }
+        texture = tex
+
+        let rpd = MTLRenderPassDescriptor()
+        rpd.colorAttachments[0].texture = tex
+        rpd.colorAttachments[0].loadAction = .clear
+        rpd.colorAttachments[0].storeAction = .store
+        rpd.colorAttachments[0].clearColor = MTLClearColorMake(0, 0, 0, 1)
+        passDescriptor = rpd
+    }
+
+    func render(time: Float, to outPath: String) throws {
+        guard let cb = commandQueue.makeCommandBuffer(),
+              let enc = cb.makeRenderCommandEncoder(descriptor: passDescriptor) else { fatalError("enc") }
+        enc.setRenderPipelineState(pipeline)
+
+        // Uniforms
+        var t = time
+        var res = SIMD2<Float>(Float(texture.width), Float(texture.height))
+        var mouse = SIMD2<Float>(0.0, 0.0)
+        enc.setFragmentBytes(&t, length: MemoryLayout<Float>.size, index: 0)
+        enc.setFragmentBytes(&res, length: MemoryLayout<SIMD2<Float>>.size, index: 1)
+        enc.setFragmentBytes(&mouse, length: MemoryLayout<SIMD2<Float>>.size, index: 2)
+
+        enc.drawPrimitives(type: .triangleStrip, vertexStart: 0, vertexCount: 4)
+        enc.endEncoding()
+        cb.commit()
+        cb.waitUntilCompleted()
+
+        try saveTexture(texture, to: outPath)
+    }
+}
+
 private func makeVertexFunction(device: MTLDevice) throws -> MTLFunction {
     let src = """
     #include <metal_stdlib>
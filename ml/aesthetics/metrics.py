@@ -5,44 +5,150 @@
 import math
 from typing import Tuple
 import numpy as np
-from skimage.color import rgb2lab
-from skimage.filters import sobel
 
+# ITU-R BT.601 luma weights
+_LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
 
-def contrast_score(img: np.ndarray) -> float:
-    # RMS contrast proxy in linear-ish space; expects float [0,1]
-    x = img.astype(np.float32)
-    mu = x.mean()
-    return float(np.sqrt(np.mean((x - mu) ** 2)))
+# sRGB (D65) -> XYZ rows pre-divided by the D65 2-degree white point, so each
+# row yields X/Xn, Y/Yn, Z/Zn directly.
+_XYZN_FROM_RGB = np.array([
+    [0.412453, 0.357580, 0.180423],
+    [0.212671, 0.715160, 0.072169],
+    [0.019334, 0.119193, 0.950227],
+], dtype=np.float32) / np.array([[0.95047], [1.0], [1.08883]], dtype=np.float32)
 
 
-def saturation_balance(img: np.ndarray) -> float:
+def to_float01(img: np.ndarray) -> np.ndarray:
+    # Integer images (uint8 renders) are scaled to float32 [0,1]; float32
+    # input is passed through without a copy, so metrics can share one cast.
+    # Alpha is dropped here so every metric scores RGB only.
+    img = img[..., :3]
+    if np.issubdtype(img.dtype, np.integer):
+        return np.multiply(img, np.float32(1.0 / np.iinfo(img.dtype).max), dtype=np.float32)
+    return img.astype(np.float32, copy=False)
+
+
+def channel_moments(img: np.ndarray) -> Tuple[int, np.ndarray, np.ndarray]:
+    # Pixel count plus per-channel float64 sum and sum-of-squares, the only
+    # reductions contrast and saturation need (no (x - mu)^2 temporaries)
+    n = img.shape[0] * img.shape[1]
+    s = np.einsum('ijk->k', img, dtype=np.float64)
+    ss = np.einsum('ijk,ijk->k', img, img, dtype=np.float64)
+    return n, s, ss
+
+
+def contrast_from_moments(n: int, s: np.ndarray, ss: np.ndarray) -> float:
+    # RMS contrast proxy in linear-ish space on [0,1] values
+    # E[x^2] - E[x]^2 over all channels; float64 moments avoid cancellation on
+    # near-uniform images.
+    m = n * len(s)
+    var = max(ss.sum() / m - (s.sum() / m) ** 2, 0.0)
+    return float(math.sqrt(var))
+
+
+def saturation_from_moments(n: int, s: np.ndarray, ss: np.ndarray) -> float:
     # Simple saturation proxy via channel variance
-    x = img.astype(np.float32)
-    var = x.var(axis=(0,1))
+    var = ss / n - (s / n) ** 2
     return float(np.clip(var.mean() * 2.0, 0.0, 1.0))
 
 
-def edge_density(img: np.ndarray) -> float:
-    edges = sobel(np.mean(img, axis=2))
-    d = float(np.mean(edges > 0.1))
+def contrast_score(img: np.ndarray) -> float:
+    return contrast_from_moments(*channel_moments(to_float01(img)))
+
+
+def saturation_balance(img: np.ndarray) -> float:
+    # Moments straight from the input (uint8 included), so no float copy is
+    # allocated; integer moments are rescaled to [0,1] units afterwards.
+    # Alpha is ignored.
+    n, s, ss = channel_moments(img[..., :3])
+    if np.issubdtype(img.dtype, np.integer):
+        scale = float(np.iinfo(img.dtype).max)
+        s /= scale
+        ss /= scale * scale
+    return saturation_from_moments(n, s, ss)
+
+
+def edge_fraction(x: np.ndarray) -> float:
+    # Sobel on BT.601 luma via shifted slices. The luma is written straight into
+    # an edge-replicated buffer, matching skimage's 'reflect' boundary.
+    x = x[..., :3]
+    H, W = x.shape[:2]
+    L = np.empty((H + 2, W + 2), dtype=np.float32)
+    np.einsum('ijk,k->ij', x, _LUMA_WEIGHTS, out=L[1:-1, 1:-1])
+    L[0, 1:-1] = L[1, 1:-1]
+    L[-1, 1:-1] = L[-2, 1:-1]
+    L[:, 0] = L[:, 1]
+    L[:, -1] = L[:, -2]
+    dx = L[:, 2:] - L[:, :-2]
+    gx = dx[:-2] + 2.0 * dx[1:-1] + dx[2:]
+    dy = L[2:, :] - L[:-2, :]
+    gy = dy[:, :-2] + 2.0 * dy[:, 1:-1] + dy[:, 2:]
+    # Unnormalized stencils: sqrt((gx^2 + gy^2) / 2) / 4 > 0.1, without the sqrt
+    return np.count_nonzero(gx * gx + gy * gy > 0.32) / gx.size
+
+
+def edge_density_from_fraction(d: float) -> float:
     # Prefer moderate edge density
     return float(1.0 - abs(d - 0.2) / 0.2)  # 1 at ~0.2 density
 
 
-def color_harmony(img: np.ndarray) -> float:
+def edge_density(img: np.ndarray) -> float:
+    return edge_density_from_fraction(edge_fraction(to_float01(img)))
+
+
+def _srgb_to_linear(c: np.ndarray) -> np.ndarray:
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def _lab_f(t: np.ndarray) -> np.ndarray:
+    # CIE piecewise cube root used by XYZ -> Lab
+    return np.where(t > 0.008856, np.cbrt(t), 7.787 * t + 16.0 / 116.0)
+
+
+def ab_variance(x: np.ndarray) -> float:
+    # var(a*) + var(b*) for float [0,1] RGB. Only a*/b* are needed, so convert
+    # per channel and never build L*.
+    r = _srgb_to_linear(x[..., 0])
+    g = _srgb_to_linear(x[..., 1])
+    b_ = _srgb_to_linear(x[..., 2])
+    (mx, my, mz) = _XYZN_FROM_RGB
+    fx = _lab_f(mx[0]*r + mx[1]*g + mx[2]*b_)
+    fy = _lab_f(my[0]*r + my[1]*g + my[2]*b_)
+    fz = _lab_f(mz[0]*r + mz[1]*g + mz[2]*b_)
+    # Stack a*/b* as (H, W, 2) and take var(a) + var(b) from one sum and one
+    # einsum sum-of-squares instead of two .var() calls with (x - mu)^2 temps
+    ab = np.empty(fx.shape + (2,), dtype=np.float32)
+    np.multiply(fx - fy, 500.0, out=ab[..., 0])
+    np.multiply(fy - fz, 200.0, out=ab[..., 1])
+    n = ab.shape[0] * ab.shape[1]
+    s = ab.sum(axis=(0, 1), dtype=np.float64)
+    ss = np.einsum('ijk,ijk->k', ab, ab, dtype=np.float64)
+    return float((ss / n - (s / n) ** 2).sum())
+
+
+def harmony_from_ab_variance(v: float) -> float:
     # Extremely rough: prefer bimodal hue hist (proxy via LAB a/b spread)
-    lab = rgb2lab(img)
-    a = lab[:,:,1].astype(np.float32)
-    b = lab[:,:,2].astype(np.float32)
-    spread = float(np.sqrt(a.var() + b.var()))
+    spread = math.sqrt(max(v, 0.0))
     return float(np.clip(spread / 40.0, 0.0, 1.0))
 
 
-def composite_score(img: np.ndarray) -> float:
+def color_harmony(img: np.ndarray) -> float:
+    return harmony_from_ab_variance(ab_variance(to_float01(img)))
+
+
+def combine(c: float, s: float, e: float, h: float) -> float:
     w1, w2, w3, w4 = 0.3, 0.3, 0.2, 0.2
-    c = contrast_score(img)
-    s = saturation_balance(img)
-    e = edge_density(img)
-    h = color_harmony(img)
     return float(np.clip(w1*h + w2*c + w3*s + w4*e, 0.0, 1.0))
+
+
+def composite_score(img: np.ndarray) -> float:
+    # Cast once and take the channel moments once; contrast and saturation
+    # both finish from them
+    x = to_float01(img)
+    n, s, ss = channel_moments(x)
+    return combine(
+        contrast_from_moments(n, s, ss),
+        saturation_from_moments(n, s, ss),
+        edge_density_from_fraction(edge_fraction(x)),
+        harmony_from_ab_variance(ab_variance(x)),
+    )
@@ -0,0 +1,40 @@
+# Fused aesthetic metrics (NumPy)
+# All four metrics from shared reductions: one float cast, one per-channel
+# sum / sum-of-squares pair feeding both contrast and saturation, one einsum
+# luma for the Sobel edges and one a*/b* conversion. The per-metric finishing
+# math comes from metrics' *_from_* helpers, so scores match
+# metrics.composite_score; see metrics_numba for the single-loop numba kernel.
+
+from typing import Dict
+import numpy as np
+
+from ml.aesthetics.metrics import (
+    to_float01,
+    channel_moments,
+    contrast_from_moments,
+    saturation_from_moments,
+    edge_fraction,
+    edge_density_from_fraction,
+    ab_variance,
+    harmony_from_ab_variance,
+    combine,
+)
+
+
+def score_all(img: np.ndarray) -> Dict[str, float]:
+    x = to_float01(img)
+
+    # One per-channel moment pass feeds both contrast and saturation
+    n, s3, ss3 = channel_moments(x)
+    c = contrast_from_moments(n, s3, ss3)
+    s = saturation_from_moments(n, s3, ss3)
+    e = edge_density_from_fraction(edge_fraction(x))
+    h = harmony_from_ab_variance(ab_variance(x))
+
+    return {
+        "contrast": c,
+        "saturation": s,
+        "edges": e,
+        "harmony": h,
+        "composite": combine(c, s, e, h),
+    }
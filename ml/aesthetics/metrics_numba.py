@@ -0,0 +1,164 @@
+# Fused aesthetic metrics (numba)
+# Single-pass equivalent of metrics.composite_score for uint8 RGB(A) renders.
+# Every pixel is read once and all four metrics accumulate into scalars, so no
+# float32 copy, luma plane, Sobel map or LAB image is ever allocated.
+
+import numpy as np
+from numba import njit, prange
+
+# sRGB -> linear lookup for every uint8 code value (replaces pow per pixel)
+_SRGB_TO_LINEAR = np.where(
+    np.arange(256) / 255.0 <= 0.04045,
+    np.arange(256) / 255.0 / 12.92,
+    ((np.arange(256) / 255.0 + 0.055) / 1.055) ** 2.4,
+)
+
+# Sobel magnitude threshold used by metrics.edge_density (0.1), expressed on
+# the squared sum of the unnormalized 3x3 stencils: sqrt((gx^2+gy^2)/2)/4 > 0.1
+_EDGE_THRESH2 = 0.32
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _lab_f(t):
+    if t > 0.008856:
+        return np.cbrt(t)
+    return 7.787 * t + 16.0 / 116.0
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _luma(img, y, x):
+    # BT.601 luma on [0, 1]
+    return (np.float32(0.299 / 255.0) * np.float32(img[y, x, 0])
+            + np.float32(0.587 / 255.0) * np.float32(img[y, x, 1])
+            + np.float32(0.114 / 255.0) * np.float32(img[y, x, 2]))
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _pixel(img_u8, i, j, H, W):
+    # Per-pixel terms: RGB on [0, 1], LAB a*/b*, and 1 if the pixel is an edge.
+    # The prange over rows lives in each parallel caller (numba only turns a
+    # prange into a parallel loop inside a parallel=True function body).
+    inv255 = np.float32(1.0 / 255.0)
+    ri = img_u8[i, j, 0]
+    gi = img_u8[i, j, 1]
+    bi = img_u8[i, j, 2]
+    r = np.float32(ri) * inv255
+    g = np.float32(gi) * inv255
+    b = np.float32(bi) * inv255
+
+    # Sobel on BT.601 luma; clamped indices match the
+    # 'reflect' boundary mode of skimage.filters.sobel
+    up = max(i - 1, 0)
+    dn = min(i + 1, H - 1)
+    lf = max(j - 1, 0)
+    rt = min(j + 1, W - 1)
+    gx = (_luma(img_u8, up, rt) + 2.0 * _luma(img_u8, i, rt) + _luma(img_u8, dn, rt)
+          - _luma(img_u8, up, lf) - 2.0 * _luma(img_u8, i, lf) - _luma(img_u8, dn, lf))
+    gy = (_luma(img_u8, dn, lf) + 2.0 * _luma(img_u8, dn, j) + _luma(img_u8, dn, rt)
+          - _luma(img_u8, up, lf) - 2.0 * _luma(img_u8, up, j) - _luma(img_u8, up, rt))
+    edge = 1 if gx * gx + gy * gy > _EDGE_THRESH2 else 0
+
+    # LAB a*/b* (D65) without L*
+    rl = _SRGB_TO_LINEAR[ri]
+    gl = _SRGB_TO_LINEAR[gi]
+    bl = _SRGB_TO_LINEAR[bi]
+    fx = _lab_f((0.412453 * rl + 0.357580 * gl + 0.180423 * bl) / 0.95047)
+    fy = _lab_f(0.212671 * rl + 0.715160 * gl + 0.072169 * bl)
+    fz = _lab_f((0.019334 * rl + 0.119193 * gl + 0.950227 * bl) / 1.08883)
+    return r, g, b, 500.0 * (fx - fy), 200.0 * (fy - fz), edge
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _finish(sums, inv_n):
+    s_r, s_g, s_b, ss_r, ss_g, ss_b, s_a, ss_a, s_bb, ss_bb, edges = sums
+    var_r = ss_r * inv_n - (s_r * inv_n) ** 2
+    var_g = ss_g * inv_n - (s_g * inv_n) ** 2
+    var_b = ss_b * inv_n - (s_b * inv_n) ** 2
+
+    mu = (s_r + s_g + s_b) * inv_n / 3.0
+    c = np.sqrt(max((ss_r + ss_g + ss_b) * inv_n / 3.0 - mu * mu, 0.0))
+    s = min(max((var_r + var_g + var_b) / 3.0 * 2.0, 0.0), 1.0)
+    e = 1.0 - abs(edges * inv_n - 0.2) / 0.2
+    var_ab = (ss_a * inv_n - (s_a * inv_n) ** 2) + (ss_bb * inv_n - (s_bb * inv_n) ** 2)
+    h = min(max(np.sqrt(max(var_ab, 0.0)) / 40.0, 0.0), 1.0)
+
+    w1, w2, w3, w4 = 0.3, 0.3, 0.2, 0.2
+    return min(max(w1*h + w2*c + w3*s + w4*e, 0.0), 1.0)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def composite_score_fused(img_u8):
+    H, W = img_u8.shape[0], img_u8.shape[1]
+    s_r = 0.0
+    s_g = 0.0
+    s_b = 0.0
+    ss_r = 0.0
+    ss_g = 0.0
+    ss_b = 0.0
+    s_a = 0.0
+    ss_a = 0.0
+    s_bb = 0.0
+    ss_bb = 0.0
+    edges = 0
+    for i in prange(H):
+        for j in range(W):
+            r, g, b, la, lb, edge = _pixel(img_u8, i, j, H, W)
+            s_r += r
+            s_g += g
+            s_b += b
+            ss_r += r * r
+            ss_g += g * g
+            ss_b += b * b
+            s_a += la
+            ss_a += la * la
+            s_bb += lb
+            ss_bb += lb * lb
+            edges += edge
+    sums = (s_r, s_g, s_b, ss_r, ss_g, ss_b, s_a, ss_a, s_bb, ss_bb, edges)
+    return _finish(sums, 1.0 / (H * W))
+
+
+def make_scorer(H, W):
+    """Returns a composite scorer compiled for C-contiguous (H, W, C>=3) uint8 images.
+
+    H, W and 1/(H*W) are baked in as compile-time constants, so the row/column
+    bounds and the normalization fold into the generated code. Bind once per
+    render size (e.g. `score = make_scorer(256, 256)`) and reuse per image.
+    """
+    H = int(H)
+    W = int(W)
+    inv_n = 1.0 / (H * W)
+
+    @njit('float32(uint8[:,:,::1])', parallel=True, fastmath=True, cache=True)
+    def score(img_u8):
+        if img_u8.shape[0] != H or img_u8.shape[1] != W or img_u8.shape[2] < 3:
+            raise ValueError("image shape does not match the scorer")
+        s_r = 0.0
+        s_g = 0.0
+        s_b = 0.0
+        ss_r = 0.0
+        ss_g = 0.0
+        ss_b = 0.0
+        s_a = 0.0
+        ss_a = 0.0
+        s_bb = 0.0
+        ss_bb = 0.0
+        edges = 0
+        for i in prange(H):
+            for j in range(W):
+                r, g, b, la, lb, edge = _pixel(img_u8, i, j, H, W)
+                s_r += r
+                s_g += g
+                s_b += b
+                ss_r += r * r
+                ss_g += g * g
+                ss_b += b * b
+                s_a += la
+                ss_a += la * la
+                s_bb += lb
+                ss_bb += lb * lb
+                edges += edge
+        sums = (s_r, s_g, s_b, ss_r, ss_g, ss_b, s_a, ss_a, s_bb, ss_bb, edges)
+        return np.float32(_finish(sums, inv_n))
+
+    return score
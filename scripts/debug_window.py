@@ -5,7 +5,8 @@ Debug window properties for MetalShaderStudio
 
 import subprocess
 import sys
-import os
+
+from swift_cache import compile_swift_cached
 
 def debug_window_via_swift():
     """Get detailed window info using Swift"""
@@ -52,22 +53,16 @@ if foundCount == 0 {
 }
 '''
     
-    # Write Swift code to temp file
-    swift_file = "/tmp/debug_window.swift"
-    with open(swift_file, 'w') as f:
-        f.write(swift_code)
-    
+    bin_path = compile_swift_cached(swift_code, 'debug_window')
+    if not bin_path:
+        return None, "Swift compilation failed"
+
     try:
-        # Compile and run Swift code
-        result = subprocess.run(['swift', swift_file], 
+        result = subprocess.run([bin_path], 
                               capture_output=True, text=True, timeout=10)
         return result.stdout, result.stderr
     except Exception as e:
         return None, f"Swift method failed: {e}"
-    finally:
-        # Clean up
-        if os.path.exists(swift_file):
-            os.remove(swift_file)
 
 def main():
     print("🔍 Debugging MetalShaderStudio windows...")
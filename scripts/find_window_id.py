@@ -24,6 +24,8 @@ import time
 import argparse
 from typing import Optional, Dict, Any
 
+from swift_cache import compile_swift_cached
+
 # Configuration from environment
 DEFAULT_MAX_RETRIES = int(os.getenv('FIND_WINDOW_MAX_RETRIES', '10'))
 DEFAULT_RETRY_DELAY = float(os.getenv('FIND_WINDOW_RETRY_DELAY', '0.5'))
@@ -137,12 +139,13 @@ if let jsonData = try? JSONSerialization.data(withJSONObject: matches, options:
 }}
 '''
     
-    swift_file = "/tmp/find_window.swift"
+    # Retries reuse the same source, so only the first call pays for swiftc
+    bin_path = compile_swift_cached(swift_code, 'find_window', verbose)
+    if not bin_path:
+        return []
+
     try:
-        with open(swift_file, 'w') as f:
-            f.write(swift_code)
-        
-        result = subprocess.run(['swift', swift_file], 
+        result = subprocess.run([bin_path], 
                               capture_output=True, text=True, timeout=15)
         
         if result.returncode == 0 and result.stdout.strip():
@@ -159,12 +162,6 @@ if let jsonData = try? JSONSerialization.data(withJSONObject: matches, options:
     except Exception as e:
         log_stderr(f"Swift method error: {e}", verbose)
         return []
-    finally:
-        if os.path.exists(swift_file):
-            try:
-                os.remove(swift_file)
-            except:
-                pass
 
 
 def select_best_window(windows: list, strategy: str = 'frontmost') -> Optional[Dict[str, Any]]:
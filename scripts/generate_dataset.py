@@ -3,59 +3,187 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import subprocess
 import json
+import hashlib
+import glob
+from contextlib import nullcontext
 import numpy as np
-from PIL import Image
-import itertools
-
-# Import metrics from the existing script
-from ml.aesthetics.metrics import composite_score
-
-def render_shader(shader_path, output_path, width, height, time, complexity, colorShift):
-    """Renders a shader using ShaderRenderCLI."""
-    command = [
-        "swift", "run", "ShaderRenderCLI",
-        "--shader-file", shader_path,
-        "--out", output_path,
-        "--width", str(width),
-        "--height", str(height),
-        "--time", str(time),
-        "--complexity", str(complexity),
-        "--colorShift", str(colorShift)
-    ]
-    subprocess.run(command, check=True)
-
-def generate_dataset(shader_path, output_dir, variations):
-    """Generates a dataset of images by rendering a shader with different parameters."""
+from imageio.v3 import imread
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Fused single-pass scorer (same score as ml.aesthetics.metrics.composite_score)
+import numba
+from ml.aesthetics import metrics_numba
+from ml.aesthetics.metrics_numba import make_scorer
+
+RENDER_WIDTH = 256
+RENDER_HEIGHT = 256
+
+# Stored with every score; cached scores from a different scorer source are
+# recomputed from the cached render instead of being reused
+with open(metrics_numba.__file__, "rb") as _f:
+    SCORER_VERSION = hashlib.blake2s(_f.read()).hexdigest()[:16]
+
+class BatchRenderer:
+    """Long-lived `ShaderRenderCLI --batch -` process that renders one frame per JSON line.
+
+    Keeps the Metal device, pipeline and output texture alive across frames so
+    package resolution and device init are paid once per dataset, not per image.
+    """
+
+    def __init__(self, shader_path, width, height):
+        command = [
+            "swift", "run", "ShaderRenderCLI",
+            "--batch", "-",
+            "--shader-file", shader_path,
+            "--width", str(width),
+            "--height", str(height),
+        ]
+        self.proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+
+    def render(self, output_path, time, complexity, colorShift):
+        """Renders one frame and blocks until the CLI acknowledges it."""
+        job = {"out": output_path, "time": float(time), "complexity": float(complexity), "colorShift": float(colorShift)}
+        self.proc.stdin.write(json.dumps(job) + "\n")
+        self.proc.stdin.flush()
+        for line in self.proc.stdout:
+            # `swift run` may print build progress before the first ack
+            try:
+                ack = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not ack.get("ok"):
+                raise RuntimeError(f"ShaderRenderCLI failed to render {output_path}: {ack.get('error')}")
+            return
+        raise RuntimeError(f"ShaderRenderCLI exited with code {self.proc.wait()} before rendering {output_path}")
+
+    def close(self):
+        if self.proc.stdin and not self.proc.stdin.closed:
+            self.proc.stdin.close()
+        self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_scorer = None
+
+def init_scorer():
+    """Binds the shape-specialized scorer once per worker process.
+
+    Workers already run in parallel, so each keeps numba to one thread.
+    """
+    global _scorer
+    numba.set_num_threads(1)
+    _scorer = make_scorer(RENDER_HEIGHT, RENDER_WIDTH)
+
+def score_image(image_path):
+    if _scorer is None:
+        init_scorer()
+    # One decode straight to a contiguous uint8 array; the scorer reads the RGB
+    # channels of the RGBA PNG written by ShaderRenderCLI
+    return float(_scorer(imread(image_path)))
+
+def render_key(shader_path, shader_mtime, time, complexity, colorShift):
+    """Stable key for one render; changes whenever the shader file or a parameter does.
+
+    The scorer is not part of the key: a scorer change re-scores the cached
+    image (see SCORER_VERSION) rather than rendering it again.
+    """
+    ident = f"{shader_path}|{shader_mtime}|{RENDER_WIDTH}x{RENDER_HEIGHT}|{time}|{complexity}|{colorShift}"
+    return hashlib.blake2s(ident.encode()).hexdigest()[:16]
+
+def load_previous_metadata(output_dir):
+    """Returns {key: entry} from an earlier metadata.json, or {} if there is none."""
+    try:
+        with open(os.path.join(output_dir, "metadata.json")) as f:
+            return {entry["key"]: entry for entry in json.load(f) if "key" in entry}
+    except (OSError, ValueError):
+        return {}
+
+def generate_dataset(shader_path, output_dir, params, workers=None):
+    """Generates a dataset of images by rendering a shader with different parameters.
+
+    `params` is an (N, 3) array of (time, complexity, colorShift) rows; it is
+    saved next to metadata.json as params.npy, with the matching scores in
+    scores.npy, so training can skip the JSON.
+    Frames are scored in `workers` processes (default: all cores but the one
+    driving the renderer) while later frames are still rendering. Rows whose
+    render key is already in a previous metadata.json (with the image still on
+    disk) reuse that image instead of rendering again, and its score too if it
+    was computed with the current SCORER_VERSION. Afterwards, render_*.png
+    files in output_dir that the new metadata.json no longer references are
+    deleted.
+    """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    metadata = []
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) - 1)
+
+    shader_mtime = os.path.getmtime(shader_path)
+    previous = load_previous_metadata(output_dir)
+    rows = params.tolist()
+    metadata = [None] * len(rows)
+
+    misses = []
+    rescore = []
+    for i, (time, complexity, colorShift) in enumerate(rows):
+        key = render_key(shader_path, shader_mtime, time, complexity, colorShift)
+        entry = previous.get(key)
+        if entry and os.path.exists(entry["image_path"]):
+            if entry.get("scorer") == SCORER_VERSION:
+                metadata[i] = entry
+            else:
+                rescore.append((i, key, entry["image_path"]))
+        else:
+            misses.append((i, key))
+    print(f"Reusing {len(rows) - len(misses) - len(rescore)} cached renders and scores, "
+          f"re-scoring {len(rescore)}, rendering {len(misses)}")
 
-    for i, params in enumerate(variations):
-        time = params["time"]
-        complexity = params["complexity"]
-        colorShift = params["colorShift"]
-        image_path = os.path.join(output_dir, f"render_{i}.png")
-        
-        render_shader(shader_path, image_path, 256, 256, time, complexity, colorShift)
+    if misses or rescore:
+        # The renderer is entered first so it closes only after the scoring
+        # workers (forked while its stdin pipe is open) have exited
+        renderer_ctx = BatchRenderer(shader_path, RENDER_WIDTH, RENDER_HEIGHT) if misses else nullcontext()
+        with renderer_ctx as renderer, \
+                ProcessPoolExecutor(max_workers=workers, initializer=init_scorer) as scorer:
+            futures = {scorer.submit(score_image, image_path): (i, key, image_path)
+                       for i, key, image_path in rescore}
+            for i, key in misses:
+                time, complexity, colorShift = rows[i]
+                image_path = os.path.join(output_dir, f"render_{key}.png")
+                renderer.render(image_path, time, complexity, colorShift)
+                futures[scorer.submit(score_image, image_path)] = (i, key, image_path)
 
-        # Score the image
-        img = Image.open(image_path)
-        img_array = np.array(img.convert("RGB"))
-        score = composite_score(img_array)
+            for future in as_completed(futures):
+                i, key, image_path = futures[future]
+                time, complexity, colorShift = rows[i]
+                score = future.result()
 
-        metadata.append({
-            "image_path": image_path,
-            "time": time,
-            "complexity": complexity,
-            "colorShift": colorShift,
-            "score": score
-        })
+                metadata[i] = {
+                    "key": key,
+                    "image_path": image_path,
+                    "time": time,
+                    "complexity": complexity,
+                    "colorShift": colorShift,
+                    "score": score,
+                    "scorer": SCORER_VERSION
+                }
 
-        print(f"Generated {image_path} with time={time}, complexity={complexity}, colorShift={colorShift}, score={score}")
+                print(f"Generated {image_path} with time={time}, complexity={complexity}, colorShift={colorShift}, score={score}")
 
     with open(os.path.join(output_dir, "metadata.json"), "w") as f:
         json.dump(metadata, f, indent=2)
+    # Column arrays for training; metadata.json stays as the human-readable copy
+    np.save(os.path.join(output_dir, "params.npy"), params)
+    np.save(os.path.join(output_dir, "scores.npy"), np.array([entry["score"] for entry in metadata], dtype=np.float32))
+
+    # Drop renders from earlier sweeps or shader versions that are no longer referenced
+    keep = {os.path.basename(entry["image_path"]) for entry in metadata}
+    for path in glob.glob(os.path.join(output_dir, "render_*.png")):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
 
 if __name__ == "__main__":
     shader = "/Users/erichowens/coding/metal-shader-mcp/shaders/plasma_fractal.metal"
@@ -65,9 +193,13 @@ if __name__ == "__main__":
     complexity_variations = np.linspace(0, 1, 5)
     colorShift_variations = np.linspace(0, 1, 5)
 
-    variations = list(itertools.product(time_variations, complexity_variations, colorShift_variations))
-    
-    # Convert to list of dictionaries
-    variations = [{"time": t, "complexity": c, "colorShift": cs} for t, c, cs in variations]
+    # (N, 3) float32 sweep, one row per variation in time-major order, built by
+    # indexing the axes with the grid's index tuples (no Python-level loop)
+    idx = np.indices((len(time_variations), len(complexity_variations), len(colorShift_variations))).reshape(3, -1).T
+    params = np.stack([
+        time_variations[idx[:, 0]],
+        complexity_variations[idx[:, 1]],
+        colorShift_variations[idx[:, 2]],
+    ], axis=1).astype(np.float32)
     
-    generate_dataset(shader, output, variations)
+    generate_dataset(shader, output, params)
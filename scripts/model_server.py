@@ -1,23 +1,54 @@
 from flask import Flask, request, jsonify
 import joblib
 import numpy as np
+import threading
 
 app = Flask(__name__)
 
-# Load the trained model
-model = joblib.load("shader_aesthetic_model.pkl")
+# Load the trained model; mmap_mode keeps its arrays shared across forked workers
+model = joblib.load("shader_aesthetic_model.pkl", mmap_mode="r")
+# Warm the predict path so the first request doesn't pay for it
+_ = model.predict(np.zeros((1, 3), dtype=np.float32))
+
+# Reusable per-thread feature row (the dev server handles requests on threads)
+_local = threading.local()
+
+def _feature_buf():
+    buf = getattr(_local, "buf", None)
+    if buf is None:
+        buf = _local.buf = np.empty((1, 3), dtype=np.float32)
+    return buf
 
 @app.route("/predict", methods=["POST"])
 def predict():
     data = request.get_json()
-    time = data["time"]
-    complexity = data["complexity"]
-    colorShift = data["colorShift"]
+    features = _feature_buf()
+    features[0, 0] = data["time"]
+    features[0, 1] = data["complexity"]
+    features[0, 2] = data["colorShift"]
 
-    features = np.array([[time, complexity, colorShift]])
     prediction = model.predict(features)
 
-    return jsonify({"score": prediction[0]})
+    return jsonify({"score": float(prediction[0])})
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    # {"rows": [[time, complexity, colorShift], ...]} -> one vectorized predict
+    error = {"error": "rows must be a list of [time, complexity, colorShift]"}
+    data = request.get_json(silent=True) or {}
+    try:
+        rows = np.asarray(data["rows"], dtype=np.float32)
+    except (KeyError, TypeError, ValueError):
+        return jsonify(error), 400
+    if rows.ndim >= 1 and rows.shape[0] == 0:
+        return jsonify({"scores": []})
+    if rows.ndim != 2 or rows.shape[1] != 3 or not np.isfinite(rows).all():
+        return jsonify(error), 400
+
+    return jsonify({"scores": model.predict(rows).tolist()})
 
 if __name__ == "__main__":
+    # Dev server. For several workers sharing the mmap'd model, run e.g.
+    # `gunicorn -w 4 --preload --pythonpath scripts -b 127.0.0.1:5001 model_server:app`
+    # from the repo root (where shader_aesthetic_model.pkl lives)
     app.run(port=5001)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compile-once cache for the small Swift helpers used by find_window_id.py and
+debug_window.py. Kept free of newer syntax so both scripts still run on the
+system python3 that ships with macOS.
+"""
+
+import subprocess
+import sys
+import os
+import stat
+import tempfile
+import fcntl
+import hashlib
+from typing import Optional
+
+
+def _private_cache_dir() -> Optional[str]:
+    """
+    Per-user cache directory (mode 0700) under the temp dir. On macOS
+    gettempdir() is already the per-user $TMPDIR; elsewhere the uid suffix
+    keeps users apart. Returns None if the directory can't be trusted.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"metal-shader-mcp-swift-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        return None
+    return path
+
+
+def compile_swift_cached(swift_code: str, name: str, verbose: bool = True) -> Optional[str]:
+    """
+    Compile Swift source once with swiftc -O and cache the binary in a private
+    per-user directory, keyed on a hash of the source. Returns the binary path,
+    or None on failure.
+    """
+    cache_dir = _private_cache_dir()
+    if cache_dir is None:
+        if verbose:
+            print("Swift binary cache directory is not private to this user; refusing to use it", file=sys.stderr)
+        return None
+
+    h = hashlib.sha1(swift_code.encode()).hexdigest()[:16]
+    bin_path = os.path.join(cache_dir, f"{name}_{h}")
+    if os.path.exists(bin_path):
+        return bin_path
+
+    # Serialize compiles so parallel invocations don't race on the same binary
+    with open(f"{bin_path}.lock", 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if os.path.exists(bin_path):
+            return bin_path
+        src_path = f"{bin_path}.swift"
+        tmp_bin = f"{bin_path}.{os.getpid()}.tmp"
+        try:
+            with open(src_path, 'w') as f:
+                f.write(swift_code)
+            result = subprocess.run(['swiftc', '-O', '-o', tmp_bin, src_path],
+                                  capture_output=True, text=True, timeout=120)
+            if result.returncode != 0:
+                if verbose:
+                    print(f"swiftc failed: {result.stderr}", file=sys.stderr)
+                return None
+            os.replace(tmp_bin, bin_path)
+            return bin_path
+        except Exception as e:
+            if verbose:
+                print(f"swiftc error: {e}", file=sys.stderr)
+            return None
+        finally:
+            for path in (src_path, tmp_bin):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
@@ -22,22 +22,73 @@ if not REPO or not TOKEN:
     print("Missing GITHUB_REPOSITORY or GITHUB_TOKEN", file=sys.stderr)
     sys.exit(1)
 
+# One pooled session so every API call reuses the same TLS connection
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Authorization": f"Bearer {TOKEN}",
+    "Accept": "application/vnd.github+json",
+})
+
+ETAG_CACHE_FILE = Path(".github/cache/etags.json")
+DEBUG = os.environ.get("TASK_SYNC_DEBUG", "") not in ("", "0")
+
+def load_etag_cache():
+    try:
+        with open(ETAG_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+ETAG_CACHE = load_etag_cache()
+
+def save_etag_cache():
+    ETAG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(ETAG_CACHE_FILE, "w") as f:
+        json.dump(ETAG_CACHE, f)
+
 def gh_request(method: str, path: str, **kwargs):
-    headers = kwargs.pop("headers", {})
-    headers["Authorization"] = f"Bearer {TOKEN}"
-    headers["Accept"] = "application/vnd.github+json"
     url = f"{API}{path}"
-    r = requests.request(method, url, headers=headers, **kwargs)
-    if r.status_code // 100 != 2:
+    r = SESSION.request(method, url, **kwargs)
+    if DEBUG:
+        print(f"{method} {path} -> {r.status_code} (rate limit remaining "
+              f"{r.headers.get('x-ratelimit-remaining')}/{r.headers.get('x-ratelimit-limit')})", file=sys.stderr)
+    if r.status_code // 100 != 2 and r.status_code != 304:
         print(f"GitHub API error {r.status_code}: {r.text}", file=sys.stderr)
     return r
 
+def gh_get_json(path: str, etag_cache_key: str):
+    """GET a JSON resource with If-None-Match; a 304 returns the cached body.
+
+    Returns None if the request failed.
+    """
+    cached = ETAG_CACHE.get(etag_cache_key)
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    r = gh_request("GET", path, headers=headers)
+    if r.status_code == 304 and cached:
+        return cached["body"]
+    if r.status_code // 100 != 2:
+        return None
+    body = r.json()
+    if r.headers.get("ETag"):
+        ETAG_CACHE[etag_cache_key] = {"etag": r.headers["ETag"], "body": body}
+    return body
+
+LABEL_SENTINEL = Path(".github/cache/label_ensured")
+
 def ensure_label():
-    # Create label if missing
+    # Create label if missing; a sentinel from an earlier run skips the lookup
+    if LABEL_SENTINEL.exists():
+        return
     r = gh_request("GET", "/labels")
+    if r.status_code // 100 != 2:
+        return
     names = [x["name"] for x in r.json()]
     if LABEL not in names:
-        gh_request("POST", "/labels", json={"name": LABEL, "color": "0ea5e9", "description": "Task Master task"})
+        r = gh_request("POST", "/labels", json={"name": LABEL, "color": "0ea5e9", "description": "Task Master task"})
+        if r.status_code // 100 != 2:
+            return
+    LABEL_SENTINEL.parent.mkdir(parents=True, exist_ok=True)
+    LABEL_SENTINEL.touch()
 
 def load_tasks():
     for p in TASKS_FILE_CANDIDATES:
@@ -52,8 +103,12 @@ def list_all_issues():
     issues = []
     page = 1
     while True:
-        r = gh_request("GET", f"/issues?state=all&labels={LABEL}&per_page=100&page={page}")
-        batch = r.json()
+        batch = gh_get_json(f"/issues?state=all&labels={LABEL}&per_page=100&page={page}",
+                            f"issues:{LABEL}:page={page}")
+        if batch is None:
+            # A partial list would make main() open duplicates of the unseen issues
+            print(f"Failed to list issues (page {page}); aborting sync", file=sys.stderr)
+            sys.exit(1)
         if not batch:
             break
         issues.extend(batch)
@@ -83,6 +138,7 @@ def main():
         return
 
     issues = list_all_issues()
+    save_etag_cache()
     by_title = {i["title"]: i for i in issues}
 
     files = changed_files()
@@ -95,6 +151,7 @@ def main():
                 break
         if not snippet_file:
             snippet_file = files[0]
+    snippet_text = read_snippet(snippet_file) if snippet_file else ""
 
     for t in tasks:
         tid = t.get("id") or t.get("title")
@@ -108,9 +165,6 @@ def main():
         - Owner: {t.get('owner','')}
         - Acceptance: {t.get('acceptance', [])}
         - Links: {t.get('links', [])}
-        
-        Latest commit: `{HEAD_SHA}`
-        Changed files (last commit): {files}
         """)
 
         # Ensure issue exists
@@ -118,8 +172,10 @@ def main():
             r = gh_request("POST", "/issues", json={"title": title, "body": body, "labels": [LABEL]})
             if r.status_code // 100 == 2:
                 by_title[title] = r.json()
-        else:
-            # Update body a bit so it remains fresh
+        elif (by_title[title].get("body") or "").strip() != body.strip():
+            # The body only carries task fields (commit info goes in the closing
+            # comment), so unchanged tasks cost no write. Bodies edited by hand on
+            # GitHub still differ and get overwritten.
             num = by_title[title]["number"]
             gh_request("PATCH", f"/issues/{num}", json={"body": body})
 
@@ -127,19 +183,20 @@ def main():
         if t.get("status") in ("done", "complete", "closed"):
             iss = by_title[title]
             num = iss["number"]
-            comment = textwrap.dedent("""
+            comment = textwrap.dedent(f"""
             Closing via Task Master status.
 
             Summary:
             - Task marked complete in .taskmaster/tasks/tasks.json
             - This action adds proof-of-work: commit hash, changed files, and a short code excerpt.
             
+            Latest commit: `{HEAD_SHA}`
+            Changed files (last commit): {files}
+
             Code excerpt:
             """)
-            if snippet_file:
-                snippet = read_snippet(snippet_file)
-                if snippet:
-                    comment += f"\n```\n{snippet}\n```\n"
+            if snippet_text:
+                comment += f"\n```\n{snippet_text}\n```\n"
             gh_request("POST", f"/issues/{num}/comments", json={"body": comment})
             gh_request("PATCH", f"/issues/{num}", json={"state": "closed"})
 
@@ -1,4 +1,5 @@
 import json
+import os
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
@@ -6,13 +7,24 @@ from sklearn.metrics import mean_squared_error
 import joblib
 
 def train_model(dataset_path):
-    """Trains a linear regression model on the shader dataset."""
-    with open(dataset_path, "r") as f:
-        metadata = json.load(f)
+    """Trains a linear regression model on the shader dataset.
+
+    Uses params.npy / scores.npy next to `dataset_path` (memory-mapped) when
+    present, and falls back to parsing the metadata JSON otherwise.
+    """
+    dataset_dir = os.path.dirname(dataset_path)
+    params_path = os.path.join(dataset_dir, "params.npy")
+    scores_path = os.path.join(dataset_dir, "scores.npy")
 
     # Prepare the data
-    X = np.array([[item["time"], item["complexity"], item["colorShift"]] for item in metadata])
-    y = np.array([item["score"] for item in metadata])
+    if os.path.exists(params_path) and os.path.exists(scores_path):
+        X = np.load(params_path, mmap_mode="r")
+        y = np.load(scores_path, mmap_mode="r")
+    else:
+        with open(dataset_path, "r") as f:
+            metadata = json.load(f)
+        X = np.array([[item["time"], item["complexity"], item["colorShift"]] for item in metadata])
+        y = np.array([item["score"] for item in metadata])
 
     # Split the data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
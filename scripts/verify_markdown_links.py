@@ -2,36 +2,61 @@
 import os, re, sys
 
 errors = 0
-link_re = re.compile(r'\[[^\]]+\]\(([^)]+)\)')
+link_re = re.compile(r'\[[^\]\n]+\]\(([^)\n]+)\)')
+fence_re = re.compile(r'^[ \t]*```.*$', re.MULTILINE)
+SKIP_ROOTS = ('./archive', './node_modules')
 
-for root, _, files in os.walk('.'):
-  if root.startswith('./archive') or root.startswith('./node_modules'):
-    continue
+# One traversal collects every existing path (so link checks are set lookups
+# instead of a stat per link) and the markdown files to scan.
+existing = {'.'}
+markdown = []
+for root, dirs, files in os.walk('.'):
+  kept = []
+  for d in dirs:
+    existing.add(os.path.normpath(os.path.join(root, d)))
+    if not (os.path.join(root, d).startswith(SKIP_ROOTS) or os.path.join(root, d) == './.git'):
+      kept.append(d)
+  dirs[:] = kept
   for f in files:
-    if not f.endswith('.md'):
-      continue
     p = os.path.join(root, f)
-    try:
-      in_code_block = False
-      with open(p, 'r', encoding='utf-8', errors='ignore') as fh:
-        for i, line in enumerate(fh, 1):
-          # Skip lines in fenced code blocks
-          if line.strip().startswith('```'):
-            in_code_block = not in_code_block
-            continue
-          if in_code_block:
-            continue
-          
-          for m in link_re.finditer(line):
-            target = m.group(1)
-            if '://' in target or target.startswith('#') or target.startswith('mailto:'):
-              continue
-            q = os.path.normpath(os.path.join(root, target))
-            if not os.path.exists(q):
-              print(f"Broken link {p}:{i} -> {target}")
-              errors += 1
-    except Exception as e:
-      print(f"Error reading {p}: {e}")
+    existing.add(os.path.normpath(p))
+    if f.endswith('.md'):
+      markdown.append((root, p))
+
+def target_exists(q):
+  # Set misses (paths outside the walk, under skipped or symlinked dirs, or
+  # matching only case-insensitively) fall back to a stat
+  return q in existing or os.path.exists(q)
+
+for root, p in markdown:
+  try:
+    with open(p, 'r', encoding='utf-8', errors='ignore') as fh:
+      text = fh.read()
+  except Exception as e:
+    print(f"Error reading {p}: {e}")
+    continue
+
+  # Spans of fenced code blocks (fence lines included) are skipped
+  fences = [m.span() for m in fence_re.finditer(text)]
+  skipped = []
+  for k in range(0, len(fences), 2):
+    end = fences[k + 1][1] if k + 1 < len(fences) else len(text)
+    skipped.append((fences[k][0], end))
+
+  line, pos = 1, 0
+  for m in link_re.finditer(text):
+    start = m.start()
+    if any(a <= start < b for a, b in skipped):
+      continue
+    target = m.group(1)
+    if '://' in target or target.startswith('#') or target.startswith('mailto:'):
+      continue
+    q = os.path.normpath(os.path.join(root, target))
+    if not target_exists(q):
+      line += text.count('\n', pos, start)
+      pos = start
+      print(f"Broken link {p}:{line} -> {target}")
+      errors += 1
 
 if errors:
   sys.exit(1)